@@ -24,9 +24,8 @@ class TestOps(TestCase):
         boxes = torch.rand(N, 4) * 100
         boxes[:, 2:] += boxes[:, :2]
         boxes[-1, :] = boxes[0, :]
-        x0, y0, x1, y1 = boxes[-1].tolist()
         iou_thresh += 1e-5
-        boxes[-1, 2] += (x1 - x0) * (1 - iou_thresh) / iou_thresh
+        boxes[-1, 2] += (boxes[-1, 2] - boxes[-1, 0]) * (1 - iou_thresh) / iou_thresh
         scores = torch.rand(N)
         return boxes, scores
 
@@ -49,6 +48,20 @@ class TestOps(TestCase):
         test_utils = ["test_schema", "test_autograd_registration", "test_faketensor", "test_aot_dispatch_dynamic"]
         opcheck(torch.ops.torchao.prepack_fp6_weight, (fp6_weight,), test_utils=test_utils)
 
+    @unittest.skipIf(not torch.cuda.is_available(), "CUDA not available")
+    def test_prepack_fp6_weight_cuda(self):
+        OC = 256
+        IC = 256
+        fp6_weight, _, _ = self._create_fp6_inputs(0, OC, IC)
+        fp6_weight_cuda = fp6_weight.cuda()
+
+        result = torchao.ops.prepack_fp6_weight(fp6_weight_cuda)
+        expected = torchao.ops.prepack_fp6_weight(fp6_weight)
+        torch.testing.assert_close(result.cpu(), expected, rtol=0, atol=0)
+
+        test_utils = ["test_schema", "test_autograd_registration", "test_faketensor", "test_aot_dispatch_dynamic"]
+        opcheck(torch.ops.torchao.prepack_fp6_weight, (fp6_weight_cuda,), test_utils=test_utils)
+
     @unittest.skipIf(not torch.cuda.is_available(), "CUDA not available")
     def test_fp16_to_fp6(self):
         OC = 256
@@ -69,6 +82,37 @@ class TestOps(TestCase):
         test_utils = ["test_schema", "test_autograd_registration", "test_faketensor", "test_aot_dispatch_dynamic"]
         opcheck(torch.ops.torchao.fp16_to_fp6, (fp16_weight,), test_utils=test_utils)
 
+    @unittest.skipIf(not torch.cuda.is_available(), "CUDA not available")
+    def test_fp16_to_fp6_cuda(self):
+        OC = 256
+        IC = 256
+
+        fp6_absmax = 28.0
+        fp6_absmin = 0.0625
+        fp16_weight = torch.randn((OC, IC), dtype=torch.float16)
+        fp16_weight.clip_(-fp6_absmax, fp6_absmax)
+        fp16_weight[fp16_weight.abs() < fp6_absmin] = 0
+        fp16_weight_cuda = fp16_weight.cuda()
+
+        result = torchao.ops.fp16_to_fp6(fp16_weight_cuda)
+        expected = torchao.ops.fp16_to_fp6(fp16_weight)
+        torch.testing.assert_close(result.cpu(), expected, rtol=0, atol=0)
+
+        test_utils = ["test_schema", "test_autograd_registration", "test_faketensor", "test_aot_dispatch_dynamic"]
+        opcheck(torch.ops.torchao.fp16_to_fp6, (fp16_weight_cuda,), test_utils=test_utils)
+
+        # unlike the CPU path, out-of-range values are saturated to +-28 (inf and NaN included)
+        # and values below the FP6 absmin are flushed to +-0
+        fp16_weight = torch.tensor([[100.0, -100.0, float("inf"), -float("inf"), float("nan"), 0.03, -0.03, 1e-6]], dtype=torch.float16)
+        codes = torch.tensor([0x1f, 0x3f, 0x1f, 0x3f, 0x1f, 0x00, 0x20, 0x00], dtype=torch.int32).view(-1, 4)
+        expected = torch.stack([
+            (codes[:, 0] << 2) | (codes[:, 1] >> 4),
+            ((codes[:, 1] & 0x0f) << 4) | (codes[:, 2] >> 2),
+            ((codes[:, 2] & 0x03) << 6) | codes[:, 3],
+        ], dim=-1).to(torch.uint8).view(1, -1)
+        result = torchao.ops.fp16_to_fp6(fp16_weight.cuda())
+        torch.testing.assert_close(result.cpu(), expected, rtol=0, atol=0)
+
     @unittest.skipIf(not torch.cuda.is_available(), "CUDA not available")
     def test_fp16act_fp6weight_linear(self):
         BS = 2
@@ -102,20 +146,46 @@ class TestOps(TestCase):
         test_utils = ["test_schema", "test_autograd_registration", "test_faketensor", "test_aot_dispatch_dynamic"]
         opcheck(torch.ops.torchao.fp6_weight_dequant, (fp6_weight, fp16_scale), test_utils=test_utils)
 
+        out = torch.empty((OC, IC), dtype=torch.float16)
+        opcheck(torch.ops.torchao.fp6_weight_dequant_out, (fp6_weight, fp16_scale, out), test_utils=test_utils)
+
+    @unittest.skipIf(not torch.cuda.is_available(), "CUDA not available")
+    def test_fp6_weight_dequant_cuda(self):
+        OC = 256
+        IC = 256
+        fp6_weight, fp16_scale, _ = self._create_fp6_inputs(0, OC, IC)
+        fp6_weight_cuda = fp6_weight.cuda()
+        scale_cuda = fp16_scale.cuda()
+
+        # must match the CPU reference bit by bit
+        result = torchao.ops.fp6_weight_dequant(fp6_weight_cuda, scale_cuda)
+        expected = torchao.ops.fp6_weight_dequant(fp6_weight, fp16_scale)
+        torch.testing.assert_close(result.cpu(), expected, rtol=0, atol=0)
+
+        test_utils = ["test_schema", "test_autograd_registration", "test_faketensor", "test_aot_dispatch_dynamic"]
+        opcheck(torch.ops.torchao.fp6_weight_dequant, (fp6_weight_cuda, scale_cuda), test_utils=test_utils)
+
+        out = torch.empty((OC, IC), dtype=torch.float16, device="cuda")
+        torchao.ops.fp6_weight_dequant(fp6_weight_cuda, scale_cuda, out=out)
+        torch.testing.assert_close(out, result, rtol=0, atol=0)
+        opcheck(torch.ops.torchao.fp6_weight_dequant_out, (fp6_weight_cuda, scale_cuda, out), test_utils=test_utils)
+
     # adapted from https://github.com/usyd-fsalab/fp6_llm/blob/main/tests/python/kernel_test.py
-    @parameterized.expand([(1, 2048, 4096, 5), (2, 8192, 8192, 6)])
+    @parameterized.expand([(1, 2048, 4096, 5), (2, 8192, 8192, 6), (1, 2048, 4096, 0)])
     @unittest.skipIf(not torch.cuda.is_available(), "CUDA not available")
     def test_fp6_matmul_correctness(self, BS, OC, IC, splitK):
         fp6_weight, fp16_scale, fp16_activation = self._create_fp6_inputs(BS, OC, IC)
 
-        fp6_weight_packed = torchao.ops.prepack_fp6_weight(fp6_weight)
+        # the FP6 weight is copied to the GPU once, then prepacked and dequantized there
+        fp6_weight_cuda = fp6_weight.cuda()
         act_cuda = fp16_activation.cuda()
-        weight_cuda = fp6_weight_packed.cuda()
         scale_cuda = fp16_scale.cuda()
+        weight_cuda = torchao.ops.prepack_fp6_weight(fp6_weight_cuda)
 
         results_fp6 = torchao.ops.fp16act_fp6weight_linear(act_cuda, weight_cuda, scale_cuda, splitK)
 
-        fp16_weight = torchao.ops.fp6_weight_dequant(fp6_weight, fp16_scale).cuda()
+        fp16_weight = torch.empty((OC, IC), dtype=torch.float16, device="cuda")
+        torchao.ops.fp6_weight_dequant(fp6_weight_cuda, scale_cuda, out=fp16_weight)
         results_fp16 = act_cuda @ fp16_weight.T
 
         error = (results_fp6 - results_fp16).abs()
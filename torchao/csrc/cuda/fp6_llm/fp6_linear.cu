@@ -118,9 +118,31 @@ cudaError_t fp6_linear_kernel(cudaStream_t    stream,
 
 #include <torch/extension.h>
 #include <ATen/ATen.h>
+#include <ATen/cuda/CUDAContext.h>
+#include <c10/cuda/CUDAGuard.h>
 #include <torch/library.h>
 
 namespace torchao {
+/*
+ * Picks splitK when the caller passes splitK=0.
+ * Small batch sizes only produce a few thread blocks, so K is split until there are about 2 thread blocks per SM,
+ * without exceeding the number of K tiles.
+ */
+static int64_t get_split_k(size_t M_Global, size_t N_Global, size_t K_Global)
+{
+    // Same tiling as in fp6_linear_kernel(): TILE_M is always 256, TILE_N goes from 8 to 64 depending on N.
+    size_t TILE_M = TilingConfig<4, 1, 8>::TILE_M;
+    size_t TILE_N = 8;
+    while (TILE_N < N_Global && TILE_N < TilingConfig<4, 1, 8>::TILE_N)  TILE_N *= 2;
+    size_t NumTiles = (M_Global / TILE_M) * ((N_Global + TILE_N - 1) / TILE_N);
+    if (NumTiles == 0)  return 1;
+    size_t NumSMs   = at::cuda::getCurrentDeviceProperties()->multiProcessorCount;
+    size_t SplitK   = (2 * NumSMs - 1) / NumTiles + 1;
+    SplitK = std::min(SplitK, (size_t)16);
+    SplitK = std::min(SplitK, K_Global / WARP_K);
+    return std::max(SplitK, (size_t)1);
+}
+
 /*
 Computes FP6-FP16 GEMM (PyTorch interface).
 
@@ -132,7 +154,7 @@ After Equivalent transformation    :    trans(Out) = W * trans(In). Note that we
   _in_feats:  tensor of shape [B, IC];                  // half 
   _weights:   int tensor of shape [OC, IC // 16 * 3];   // 3 INT32 words contains 16 FP6 weights.
   _scales:    tensor of shape [OC];                     // half
-  splitK:     spliting the MatMul problem along K dimension for higher GPU utilization, default 1.
+  splitK:     spliting the MatMul problem along K dimension for higher GPU utilization, default 1. 0 means picking it automatically.
 [Outputs]
   _out_feats: tensor of shape [B, OC];                  // half
 */
@@ -141,15 +163,23 @@ torch::Tensor fp6_linear_forward_cuda(torch::Tensor _in_feats,
                                       torch::Tensor _scales,
                                       int64_t       splitK=1)
 {
+    // Both the splitK heuristic and the launch below query the current device.
+    TORCH_CHECK(_in_feats.is_cuda(), "input must be on CUDA");
+    const c10::cuda::CUDAGuard device_guard(_in_feats.device());
     int num_in_feats      = _in_feats.size(0);
     int num_in_channels   = _in_feats.size(1);
     int num_out_channels  = _weights.size(0);
-    assert( num_in_channels%64 == 0 );
-    assert( (num_in_channels/16*3) == _weights.size(1) );    // Making sure the K dimension is matched.
+    // The kernel is specialized for these layouts: there is no tail handling along M or K.
+    TORCH_CHECK(num_in_channels % 64 == 0, "Expect input dim % 64 == 0, but receive ", num_in_channels, " instead.");
+    TORCH_CHECK(num_out_channels % 256 == 0, "Expect output dim % 256 == 0, but receive ", num_out_channels, " instead.");
+    TORCH_CHECK((num_in_channels/16*3) == _weights.size(1), "Dimensions mismatched");    // Making sure the K dimension is matched.
     //
     int M = num_out_channels;
     int K = num_in_channels;
     int N = num_in_feats;
+    TORCH_CHECK(splitK >= 0, "splitK must be non-negative, got ", splitK);
+    if (splitK == 0)
+        splitK = get_split_k(M, N, K);
     // Input Tensors
     auto weight = reinterpret_cast<const uint4*>(_weights.data_ptr<int>());  // weights is [OC, IC] but in FP6.
     auto in_feats = reinterpret_cast<const half*>(_in_feats.data_ptr<at::Half>());
@@ -159,11 +189,16 @@ torch::Tensor fp6_linear_forward_cuda(torch::Tensor _in_feats,
     at::Tensor _out_feats = torch::empty({num_in_feats, num_out_channels}, options);
     auto out_feats = reinterpret_cast<half*>(_out_feats.data_ptr<at::Half>());
 
-    options = torch::TensorOptions().dtype(torch::kFloat32).device(_in_feats.device());
-    at::Tensor _workspace = torch::empty({splitK, num_in_feats, num_out_channels}, options);
-    auto Reduction_Workspace = reinterpret_cast<float*>(_workspace.data_ptr<float>());  // Reduction_Workspace_Size = Split_K * M_Global * N_Global * sizeof(fp32)
-      
-    fp6_linear_kernel(0, // Using default stream here.
+    // The reduction workspace is only used when splitK > 1.
+    at::Tensor _workspace;
+    float* Reduction_Workspace = nullptr;
+    if (splitK > 1) {
+        options = torch::TensorOptions().dtype(torch::kFloat32).device(_in_feats.device());
+        _workspace = torch::empty({splitK, num_in_feats, num_out_channels}, options);
+        Reduction_Workspace = reinterpret_cast<float*>(_workspace.data_ptr<float>());  // Reduction_Workspace_Size = Split_K * M_Global * N_Global * sizeof(fp32)
+    }
+
+    fp6_linear_kernel(at::cuda::getCurrentCUDAStream(),
                       weight,
                       scales,
                       in_feats,
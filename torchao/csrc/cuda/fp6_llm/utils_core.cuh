@@ -40,8 +40,7 @@ __device__ __forceinline__ void initialize_mma_slice(uint32_t                  (
                                                      uint32_t                  (*b)[4],
                                                      uint32_t* __restrict__    A1_SPTR_read,
                                                      uint32_t* __restrict__    A2_SPTR_read,
-                                                     half      __restrict__    (*B_SPTR_read)[WARP_K+PADDING_SHARED_MEM_FOR_B_8],
-                                                     uint32_t*                 RPTR_Scales)
+                                                     half      __restrict__    (*B_SPTR_read)[WARP_K+PADDING_SHARED_MEM_FOR_B_8])
 {
     // Writing registers
     // Registers to store FP6 fragments for a slice (64*16) of A matrix => 32 FP6 per thread => 6 register per thread;
@@ -49,7 +48,7 @@ __device__ __forceinline__ void initialize_mma_slice(uint32_t                  (
     uint32_t a_2[4];                      // NO double buffer
     CopyFromSharedToRegister_AFrag<2>   (a_1, A1_SPTR_read, 0);
     CopyFromSharedToRegister_AFrag<4>   (a_2, A2_SPTR_read, 0);
-    Dequant_32FP6_4Way(a, a_1, a_2, RPTR_Scales);   // SIMT Dequant: dequantizing FP6 to FP16 at register level, dequantizing a slice each time 
+    Dequant_32FP6_4Way(a, a_1, a_2);   // SIMT Dequant: dequantizing FP6 to FP16 at register level, dequantizing a slice each time 
     B_FromSharedToReg<TilingConfig>(b, B_SPTR_read, 0); // Loading B from shared to registers
 }
 
@@ -60,7 +59,6 @@ __device__ __forceinline__ void core_mma_slice(float                     c[][REG
                                                uint32_t* __restrict__    A1_SPTR_read,
                                                uint32_t* __restrict__    A2_SPTR_read,
                                                half      __restrict__    (*B_SPTR_read)[WARP_K+PADDING_SHARED_MEM_FOR_B_8],
-                                               uint32_t*                 RPTR_Scales,
                                                int                       slice_id)      // writing slice[slice_id] to registers, k=0 -> slice_id=1 for prefetching
 {
     #ifdef DEBUG_MODE
@@ -99,7 +97,7 @@ __device__ __forceinline__ void core_mma_slice(float                     c[][REG
     uint32_t a_2[4];                      // NO double buffer
     CopyFromSharedToRegister_AFrag<2>   (a_1, A1_SPTR_read, slice_id);
     CopyFromSharedToRegister_AFrag<4>   (a_2, A2_SPTR_read, slice_id);
-    Dequant_32FP6_4Way(a_write, a_1, a_2, RPTR_Scales);   // SIMT Dequant: dequantizing FP6 to FP16 at register level, dequantizing a slice each time 
+    Dequant_32FP6_4Way(a_write, a_1, a_2);   // SIMT Dequant: dequantizing FP6 to FP16 at register level, dequantizing a slice each time 
     B_FromSharedToReg<TilingConfig>     (b_write, B_SPTR_read, slice_id); // Loading B from shared to registers
 }
 
@@ -117,8 +115,7 @@ template <typename TilingConfig>
 __device__ __forceinline__ void PipelinedCoreLoop(float                     c[][REG_PER_THREAD_C_TENSOR_16_16],
                                                   half      __restrict__    (*read_SPTR)[WARP_K+PADDING_SHARED_MEM_FOR_B_8],
                                                   uint32_t* __restrict__    read_SPTR_Frag1,
-                                                  uint32_t* __restrict__    read_SPTR_Frag2,
-                                                  uint32_t*                 RPTR_Scales)
+                                                  uint32_t* __restrict__    read_SPTR_Frag2)
 {
     #ifdef DEBUG_MODE
         assert((TilingConfig::WARP_COL_MMA_TENSORS==1) || (TilingConfig::WARP_COL_MMA_TENSORS%2==0));   // if WARP_COL_MMA_TENSORS == 1, B tile in registers is padded to a 16*16 MMA block
@@ -169,7 +166,7 @@ __device__ __forceinline__ void PipelinedCoreLoop(float                     c[][
             B_FromSharedToReg<TilingConfig>(b_write, read_SPTR, (k+1)*MMA_16);
         }
         // SIMT Dequant + Tensor Core computations
-        Dequant_32FP6_4Way(a, a_1_read, a_2_read, RPTR_Scales);   // Dequantizing FP6 to FP16 at register level, dequantizing a slice each time
+        Dequant_32FP6_4Way(a, a_1_read, a_2_read);   // Dequantizing FP6 to FP16 at register level, dequantizing a slice each time
         #pragma unroll
         for (int i = 0; i < WARP_ROW_MMA_TENSORS; i++) {
             if(TilingConfig::WARP_COL_MMA_TENSORS==1)
@@ -63,24 +63,22 @@ __device__ __forceinline__ void FP6_FP16_Cast_4Way_Naive(u_int32_t *R1, u_int32_
     //*R2 = 0x3c003c00;
 }
 
-__device__ __forceinline__ u_int32_t MultScale(u_int32_t PackedFP16Pair, half Scale) {
-    half* FP16_1 = reinterpret_cast<half*>(&PackedFP16Pair);
-    half* FP16_2 = FP16_1 + 1;
-    uint32_t output;
-    half* output_half_ptr = reinterpret_cast<half*>(&output);
-    output_half_ptr[0] = __hmul( __hmul(*FP16_1,__float2half(4096.0f)), Scale);
-    output_half_ptr[1] = __hmul( __hmul(*FP16_2,__float2half(4096.0f)), Scale);   
-    return output;
+/*
+ * Correcting the exponent bias (FP6: 3, FP16: 15), which is exact.
+ * Quantization scales are not applied here but in the epilogue of the GEMM, see QUANT_GEMM_Kernel().
+ */
+__device__ __forceinline__ u_int32_t MultBias(u_int32_t PackedFP16Pair) {
+    half2* FP16_Pair = reinterpret_cast<half2*>(&PackedFP16Pair);
+    half2 output = __hmul2(*FP16_Pair, __float2half2_rn(4096.0f));
+    return *reinterpret_cast<u_int32_t*>(&output);
 }
 
 __device__ __forceinline__ void Dequant_32FP6_4Way(u_int32_t __restrict__   Reg[][4], 
                                                    u_int32_t __restrict__   *read_RPTR_Frag1, 
-                                                   u_int32_t __restrict__   *read_RPTR_Frag2,
-                                                   u_int32_t                *Scales) {
+                                                   u_int32_t __restrict__   *read_RPTR_Frag2) {
     u_int32_t *OutputRegs   = reinterpret_cast<u_int32_t*> (Reg);
     u_int32_t *Frag1_PTR    = read_RPTR_Frag1;
     u_int32_t *Frag2_PTR    = read_RPTR_Frag2;
-    half      *Scale_RPTR   = reinterpret_cast<half*>(Scales);
     u_int32_t Packed_FP6    = 0;
     u_int32_t tmp           = 0;
     // Dequantizing 32 FP6, each Loop dequantizing 4 FP6
@@ -100,28 +98,12 @@ __device__ __forceinline__ void Dequant_32FP6_4Way(u_int32_t __restrict__   Reg[
         //
         FP6_FP16_Cast_4Way(&Packed_FP6, &tmp);
         //
-        *OutputRegs = MultScale(Packed_FP6, Scale_RPTR[0]  );       // Muliply FP16 scales
+        *OutputRegs = MultBias(Packed_FP6);
         OutputRegs += 1;
-        *OutputRegs = MultScale(tmp,        Scale_RPTR[1]);         // Muliply FP16 scales
+        *OutputRegs = MultBias(tmp);
         OutputRegs += 1;
-        // Updating offset for FP16 scales for every two iterations
-        if(i%2==1)  Scale_RPTR += 2;
     }
     
 }
 
-/*
- * 
- */
-__device__ __forceinline__ void ExtractFromSharedToReg_Scales(uint32_t* Scales, half* WARP_SPTR_Scales) {
-    int lane_id = threadIdx.x % WARP_SIZE;
-    uint32_t* SPTR_uint = reinterpret_cast<uint32_t*>(WARP_SPTR_Scales);
-    uint32_t tmpReg = SPTR_uint[lane_id];
-    #pragma unroll
-    for(int i=0; i<4; i++) {
-        // T __shfl_sync(unsigned mask, T var, int srcLane, int width=warpSize); 
-        Scales[i] = __shfl_sync(0xffffffff, tmpReg, i, 4); 
-    }
-}
-
 #endif
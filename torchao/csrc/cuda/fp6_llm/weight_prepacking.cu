@@ -0,0 +1,156 @@
+//    Copyright 2024 FP6-LLM authors
+//
+//    Licensed under the Apache License, Version 2.0 (the "License");
+//    you may not use this file except in compliance with the License.
+//    You may obtain a copy of the License at
+//
+//        http://www.apache.org/licenses/LICENSE-2.0
+//
+//    Unless required by applicable law or agreed to in writing, software
+//    distributed under the License is distributed on an "AS IS" BASIS,
+//    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+//    See the License for the specific language governing permissions and
+//    limitations under the License.
+//
+// GPU version of torchao/csrc/fp6_llm/weight_prepacking.cpp, which is adapted from
+// https://github.com/usyd-fsalab/fp6_llm/blob/ce76774bcfc26b325c1b558abcf1935026d9abbc/fp6_llm/csrc/utils/weight_prepacking.h
+
+#include <cuda.h>
+#include <cuda_runtime.h>
+
+#include "configs.h"
+
+/*
+ * Extracting the idx-th FP6 value of a row of continuously stored FP6 values.
+ */
+__device__ __forceinline__ uint32_t Extract_FP6(const unsigned char* RowPTR, size_t idx)
+{
+    size_t      BitOffset   = idx * WEIGHT_BIT_WIDTH;
+    const unsigned char* PTR = RowPTR + BitOffset/8;
+    int         Shift       = BitOffset % 8;
+    uint32_t    Bits        = uint32_t(__ldg(PTR)) << 8;
+    if (Shift > 8 - WEIGHT_BIT_WIDTH)   Bits |= __ldg(PTR+1);      // the FP6 value spans two Bytes
+    return (Bits >> (16 - WEIGHT_BIT_WIDTH - Shift)) & 0x3f;
+}
+
+__device__ __forceinline__ uint32_t BitInterleaving_2bit_Device(uint32_t input)
+{
+    constexpr int order_2bit[16] = {2,6,10,14,4,8,12,16,1,5,9,13,3,7,11,15};  // pre-defined order for bit-interleaving in FP6-LLM
+    uint32_t output = 0x00000000;
+    #pragma unroll
+    for(int i=0; i<16; i++)
+        output |= ( ( input << 2*(order_2bit[i]-1) ) & 0xc0000000 ) >> (i*2);
+    return output;
+}
+
+__device__ __forceinline__ uint32_t BitInterleaving_4bit_Device(uint32_t input)
+{
+    constexpr int order_4bit[8] = {2,6,4,8,1,5,3,7};  // pre-defined order for bit-interleaving in FP6-LLM
+    uint32_t output = 0x00000000;
+    #pragma unroll
+    for(int i=0; i<8; i++)
+        output |= ( ( input << 4*(order_4bit[i]-1) ) & 0xf0000000 ) >> (i*4);
+    return output;
+}
+
+/*
+ * Gathering the 8 FP6 values that Assign_32_FP6_To_4_Thread() assigns to a thread for the SegmentID-th 16*16 block.
+ * FP6[p][0~1]: 2 adjacent values of the 4 8*8 sub-blocks, p = 0: (row, col), 1: (row+8, col), 2: (row, col+8), 3: (row+8, col+8)
+ */
+__device__ __forceinline__ void Gather_8_FP6(uint32_t FP6[4][2], const unsigned char* Weight_6bit, size_t SegmentID, int lane_id, size_t K)
+{
+    const size_t    BytesPerRow = K*WEIGHT_BIT_WIDTH/8;
+    const size_t    k           = SegmentID % 4;
+    const size_t    j           = SegmentID / 4 % (K/16);
+    const size_t    i           = SegmentID / 4 / (K/16);
+    const size_t    row         = i*64 + k*16 + lane_id/4;
+    const size_t    col         = j*16 + (lane_id%4)*2;
+    #pragma unroll
+    for(int p=0; p<4; p++) {
+        const unsigned char* RowPTR = Weight_6bit + (row + (p%2)*8) * BytesPerRow;
+        #pragma unroll
+        for(int c=0; c<2; c++)
+            FP6[p][c] = Extract_FP6(RowPTR, col + (p/2)*8 + c);
+    }
+}
+
+/*
+ * GPU version of weight_matrix_prepacking(). Pass-1, Pass-2 and Pass-3 are fused:
+ * each thread computes the final value of one 32-bit word of the 4-bit fragments and, for even segments, one of the 2-bit fragments.
+ * Consecutive threads write consecutive words.
+ */
+__global__ void weight_matrix_prepacking_kernel(uint32_t* Weight_2bit, uint32_t* Weight_4bit, const unsigned char* Weight_6bit, size_t M, size_t K)
+{
+    const size_t NumSegments = M*K/256;
+    const size_t gid = (size_t)blockIdx.x * blockDim.x + threadIdx.x;
+    if (gid >= NumSegments*WARP_SIZE) return;
+    const size_t SegmentID  = gid / WARP_SIZE;
+    const int    lane_id    = gid % WARP_SIZE;
+    uint32_t FP6[4][2];
+    // 4-bit fragments: one word per segment per thread, Seg2_Byte1 ~ Seg2_Byte4 from the highest to the lowest Byte.
+    Gather_8_FP6(FP6, Weight_6bit, SegmentID, lane_id, K);
+    uint32_t Word_4bit = 0;
+    #pragma unroll
+    for(int p=0; p<4; p++)
+        Word_4bit |= ( ((FP6[p][0] & 0x0f) << 4) | (FP6[p][1] & 0x0f) ) << (24 - p*8);
+    Weight_4bit[gid] = BitInterleaving_4bit_Device(Word_4bit);
+    // 2-bit fragments: one word per two segments per thread, Seg1_Byte1 and Seg1_Byte2 of each segment.
+    if (SegmentID % 2 == 1) return;
+    uint32_t Word_2bit = 0;
+    #pragma unroll
+    for(int s=0; s<2; s++) {
+        if (s == 1) Gather_8_FP6(FP6, Weight_6bit, SegmentID+1, lane_id, K);
+        #pragma unroll
+        for(int b=0; b<2; b++) {
+            uint32_t Byte = ( (FP6[b*2][0] >> 4) << 6 ) | ( (FP6[b*2][1] >> 4) << 4 ) | ( (FP6[b*2+1][0] >> 4) << 2 ) | ( FP6[b*2+1][1] >> 4 );
+            Word_2bit |= Byte << (24 - (s*2+b)*8);
+        }
+    }
+    Weight_2bit[SegmentID/2*WARP_SIZE + lane_id] = BitInterleaving_2bit_Device(Word_2bit);
+}
+
+
+#include <ATen/ATen.h>
+#include <ATen/cuda/CUDAContext.h>
+#include <c10/cuda/CUDAException.h>
+#include <c10/cuda/CUDAGuard.h>
+#include <torch/library.h>
+
+namespace torchao {
+
+/*
+ * Weight prepacking (Pytorch interface), using GPUs.
+ * Same inputs and outputs as weight_matrix_prepacking_cpu().
+ */
+at::Tensor weight_matrix_prepacking_cuda(at::Tensor fp6_tensor)
+{
+    TORCH_CHECK(fp6_tensor.dim() == 2, "weight must be 2-dimensional");
+    size_t OC = fp6_tensor.size(0);
+    size_t IC = fp6_tensor.size(1);
+    TORCH_CHECK(fp6_tensor.scalar_type() == at::kInt, "weight must be INT32, got ", fp6_tensor.scalar_type());
+    TORCH_CHECK(fp6_tensor.is_contiguous(), "weight must be contiguous");
+    TORCH_CHECK(fp6_tensor.is_cuda(), "weight must be on CUDA");
+    const c10::cuda::CUDAGuard device_guard(fp6_tensor.device());
+    TORCH_CHECK(IC % 3 == 0, "Expect packed input dim % 3 == 0, but receive ", IC, " instead.");
+    IC = IC * 16 / 3;
+    TORCH_CHECK((OC % 256 == 0) && (IC % 64 == 0), "Expect output dim % 256 == 0 and input dim % 64 == 0, but receive ", OC, " and ", IC, " instead.");
+    auto packed_tensor = at::empty_like(fp6_tensor);
+    auto Weight_2bit = reinterpret_cast<uint32_t*>(packed_tensor.data_ptr<int>());
+    auto Weight_4bit = Weight_2bit + OC*IC*2/32;
+    auto Weight_6bit = reinterpret_cast<const unsigned char*>(fp6_tensor.data_ptr<int>());
+    //
+    size_t NumThreads = OC*IC/256*WARP_SIZE;
+    if (NumThreads == 0) return packed_tensor;
+    dim3 BlockDim(WARP_SIZE * 8, 1, 1);
+    dim3 GridDim((NumThreads - 1) / BlockDim.x + 1, 1, 1);
+    weight_matrix_prepacking_kernel<<<GridDim, BlockDim, 0, at::cuda::getCurrentCUDAStream()>>>
+                    (Weight_2bit, Weight_4bit, Weight_6bit, OC, IC);
+    C10_CUDA_KERNEL_LAUNCH_CHECK();
+    return packed_tensor;
+}
+
+TORCH_LIBRARY_IMPL(torchao, CUDA, m) {
+  m.impl("torchao::prepack_fp6_weight", &weight_matrix_prepacking_cuda);
+}
+
+}
@@ -19,6 +19,8 @@
 #include <iostream>
 #include <assert.h>
 
+#include "configs.h"
+
 /*
  * Function to pack 4 fake quantized FP16 value into continuously stored 4 FP6 values.
  */
@@ -120,6 +122,78 @@ void weight_prepacking_fp16_to_fp6(uint16_t* weight_16bit,
     }
 }
 
+/*
+ * GPU version of cast_fp16_fp6() for a single value.
+ * Instead of throwing, values larger than the FP6 absmax are saturated and values smaller than the FP6 absmin are flushed to zero.
+ */
+__device__ __forceinline__ uint32_t cast_fp16_fp6_device(uint16_t source)
+{
+    // Constants for FP6
+    constexpr int exponent_nbits_fp6 = 3;
+    constexpr int mantissa_nbits_fp6 = 2;
+    constexpr int exp_bias_fp6 = (1 << (exponent_nbits_fp6 - 1)) - 1;
+    // Constants for FP16
+    constexpr int exponent_nbits_fp16 = 5;
+    constexpr int mantissa_nbits_fp16 = 10;
+    constexpr int exp_bias_fp16 = (1 << (exponent_nbits_fp16 - 1)) - 1;
+    // FP6 absmax (28) represented in FP16
+    constexpr int absmax_fp6_in_fp16 = 0x4F00;
+
+    int source_promote = int(source);
+    int sign_bit = (source_promote >> 15);
+    // Saturating values above the FP6 absmax, including inf and NaN.
+    if ((source_promote & 0x7FFF) > absmax_fp6_in_fp16)
+        return (sign_bit << (exponent_nbits_fp6 + mantissa_nbits_fp6)) | ((1 << (exponent_nbits_fp6 + mantissa_nbits_fp6)) - 1);
+    int exp_bit = (source_promote & 0x7FFF) >> mantissa_nbits_fp16;
+    int mant_bit = source_promote & ((1 << mantissa_nbits_fp16) - 1);
+
+    int new_exp_bit;
+    int new_mant_bit;
+
+    if (exp_bit == 0) {
+        // Subnormal FP16 number. Too small for FP6.
+        new_exp_bit = 0;
+        new_mant_bit = 0;
+    } else {
+        new_mant_bit = mant_bit >> (mantissa_nbits_fp16 - mantissa_nbits_fp6);
+        new_exp_bit = exp_bit - exp_bias_fp16 + exp_bias_fp6;
+
+        // Deal with subnormal FP6 values. Values below the FP6 absmin are shifted out to zero.
+        int target_exp_val = exp_bit - exp_bias_fp16;
+        int min_fp6_exp_val = -exp_bias_fp6 + 1;
+        bool subnormal_fp6 = target_exp_val < min_fp6_exp_val;
+        if (subnormal_fp6) {
+            new_exp_bit = 0;
+            new_mant_bit = (new_mant_bit | (1 << mantissa_nbits_fp6)) >>
+                           (min_fp6_exp_val - target_exp_val);
+        }
+    }
+
+    return (sign_bit << (exponent_nbits_fp6 + mantissa_nbits_fp6)) |
+           (new_exp_bit << mantissa_nbits_fp6) | new_mant_bit;
+}
+
+/*
+ * GPU version of weight_prepacking_fp16_to_fp6().
+ * Each thread packs 4 FP16 values into 3 Bytes. K % 4 == 0, so the 4 values never span two rows.
+ */
+__global__ void weight_prepacking_fp16_to_fp6_kernel(const uint16_t* weight_16bit,
+                                                     uint8_t* weight_6bit_packed,
+                                                     size_t NumGroups)
+{
+    size_t i = (size_t)blockIdx.x * blockDim.x + threadIdx.x;
+    if (i >= NumGroups) return;
+    uint32_t fp6_temp[4];
+    #pragma unroll
+    for (int j = 0; j < 4; j++)
+        fp6_temp[j] = cast_fp16_fp6_device(weight_16bit[i*4+j]);
+    // Pack the values
+    uint8_t* FP6x4 = weight_6bit_packed + i*3;
+    FP6x4[0] = fp6_temp[0] << 2 | (fp6_temp[1] >> 4);
+    FP6x4[1] = (fp6_temp[1] & 0x0F) << 4 | (fp6_temp[2] >> 2);
+    FP6x4[2] = (fp6_temp[2] & 0x03) << 6 | fp6_temp[3];
+}
+
 void DeQuantMatrix_FP6_To_FP16(half* A_16bit_h, unsigned char* A_6bit_h, size_t M, size_t K, half* scale) {
     assert(M%64==0);                 // Currently, M must be a multiple of 64.
     assert(K%64==0);                 // Currently, K must be a multiple of 64.
@@ -154,9 +228,67 @@ void DeQuantMatrix_FP6_To_FP16(half* A_16bit_h, unsigned char* A_6bit_h, size_t
     }
 }
 
+/*
+ * GPU version of DeQuantMatrix_FP6_To_FP16().
+ * 16 FP6 values are stored in 3 INT32 words (12 Bytes), so the values of a row do not start at aligned addresses.
+ * Each WARP dequantizes 32 such blocks (96 INT32 words = 384 Bytes):
+ *      Phase 1: the packed words are copied to shared memory with aligned, fully coalesced 128-bit loads.
+ *      Phase 2: each thread reads a unique pair of adjacent FP6 values from shared memory and writes them as a half2.
+ * FP6 is converted by constructing the FP16 bits directly, without any FP32 intermediate.
+ */
+#define DEQUANT_FP6_BLOCKS_PER_WARP     32
+#define DEQUANT_INT32_PER_WARP          (DEQUANT_FP6_BLOCKS_PER_WARP*3)     // 96
+#define DEQUANT_INT32_PER_WARP_PADDED   100                                 // keep each WARP's buffer 16 Bytes aligned
+#define DEQUANT_WARPS_PER_BLOCK         4
+
+__global__ void DeQuantMatrix_FP6_To_FP16_Kernel(half* A_16bit, const uint32_t* A_6bit, size_t M, size_t K, const half* scale)
+{
+    __shared__ __align__(16) uint32_t smem[DEQUANT_WARPS_PER_BLOCK][DEQUANT_INT32_PER_WARP_PADDED];
+    const int       warpId          = threadIdx.x / WARP_SIZE;
+    const int       lane_id         = threadIdx.x % WARP_SIZE;
+    const size_t    NumFP6Blocks    = M*K/16;
+    const size_t    StartBlockID    = (blockIdx.x * DEQUANT_WARPS_PER_BLOCK + warpId) * DEQUANT_FP6_BLOCKS_PER_WARP;
+    if (StartBlockID >= NumFP6Blocks) return;
+    const int       NumBlocks       = (NumFP6Blocks - StartBlockID) < DEQUANT_FP6_BLOCKS_PER_WARP ? (NumFP6Blocks - StartBlockID) : DEQUANT_FP6_BLOCKS_PER_WARP;
+    // Phase 1: Global -> Shared
+    uint32_t*       WARP_SPTR       = smem[warpId];
+    const uint32_t* WARP_GPTR       = A_6bit + StartBlockID*3;
+    if (NumBlocks == DEQUANT_FP6_BLOCKS_PER_WARP) {
+        if (lane_id < DEQUANT_INT32_PER_WARP/4)
+            reinterpret_cast<uint4*>(WARP_SPTR)[lane_id] = reinterpret_cast<const uint4*>(WARP_GPTR)[lane_id];
+    }
+    else {
+        for (int i = lane_id; i < NumBlocks*3; i += WARP_SIZE)
+            WARP_SPTR[i] = WARP_GPTR[i];
+    }
+    __syncwarp();
+    // Phase 2: Shared -> Register -> Global
+    const unsigned char*    SPTR    = reinterpret_cast<const unsigned char*>(WARP_SPTR);
+    half2*                  OutPTR  = reinterpret_cast<half2*>(A_16bit + StartBlockID*16);
+    for (int p = lane_id; p < NumBlocks*8; p += WARP_SIZE) {
+        // The p-th pair occupies 12 bits starting from bit 12*p, i.e. either the high or the low 12 bits of 2 Bytes.
+        const int   ByteOffset  = p*3/2;
+        uint32_t    Bits        = (SPTR[ByteOffset] << 8) | SPTR[ByteOffset+1];
+        if (p%2 == 0)   Bits = Bits >> 4;
+        half        FP[2];
+        #pragma unroll
+        for (int i = 0; i < 2; i++) {
+            uint32_t FP6 = (Bits >> (6 - i*6)) & 0x3f;
+            // sign bit goes to bit 15, exponent and mantissa go to bit 12~8.
+            FP[i] = __ushort_as_half( ((FP6 & 0x20) << 10) | ((FP6 & 0x1f) << 8) );
+        }
+        // Staying in FP16: multiplying by 4096 (exponent bias correction) is exact, so the only rounding is the one of the scale multiplication.
+        const half2 Scale = __half2half2(scale[(StartBlockID*16 + p*2) / K]);
+        OutPTR[p] = __hmul2( __hmul2(__halves2half2(FP[0], FP[1]), __float2half2_rn(4096.0f)), Scale );
+    }
+}
+
 
 #include <torch/extension.h>
 #include <ATen/ATen.h>
+#include <ATen/cuda/CUDAContext.h>
+#include <c10/cuda/CUDAException.h>
+#include <c10/cuda/CUDAGuard.h>
 #include <torch/library.h>
 
 namespace torchao {
@@ -183,6 +315,48 @@ at::Tensor fp16_to_fp6_cpu(at::Tensor fp16_tensor)
     return packed_fp6_tensor;
 }
 
+/*
+ * GPU version of fp16_to_fp6_cpu().
+ * Values out of the FP6 range are saturated instead of raising an error.
+ */
+at::Tensor fp16_to_fp6_cuda(at::Tensor fp16_tensor)
+{
+    TORCH_CHECK(fp16_tensor.dim() == 2, "weight must be 2-dimensional");
+    TORCH_CHECK(fp16_tensor.scalar_type() == torch::kFloat16, "weight must be FP16");
+    TORCH_CHECK(fp16_tensor.is_contiguous(), "weight must be contiguous");
+    TORCH_CHECK(fp16_tensor.is_cuda(), "weight must be on CUDA");
+    const c10::cuda::CUDAGuard device_guard(fp16_tensor.device());
+    auto M = fp16_tensor.size(0);
+    auto K = fp16_tensor.size(1);
+    TORCH_CHECK(K % 4 == 0, "K must be multiple of 4");
+
+    auto options = at::TensorOptions().dtype(torch::kUInt8).device(fp16_tensor.device());
+    auto packed_fp6_tensor = at::empty({M, K * 6 / 8}, options);
+    uint8_t* packed_fp6_ptr = packed_fp6_tensor.data_ptr<uint8_t>();
+    const uint16_t* fake_fp6_ptr = reinterpret_cast<const uint16_t*>(fp16_tensor.data_ptr<at::Half>());
+
+    size_t NumGroups = (size_t)M * K / 4;
+    if (NumGroups == 0) return packed_fp6_tensor;
+    constexpr int NumThreads = 256;
+    weight_prepacking_fp16_to_fp6_kernel<<<(NumGroups - 1) / NumThreads + 1, NumThreads, 0, at::cuda::getCurrentCUDAStream()>>>
+                    (fake_fp6_ptr, packed_fp6_ptr, NumGroups);
+    C10_CUDA_KERNEL_LAUNCH_CHECK();
+
+    return packed_fp6_tensor;
+}
+
+/*
+ * Checking the output tensor of fp6_weight_dequant_out, which must be a contiguous FP16 tensor of shape [OC, IC].
+ */
+static void check_weight_matrix_dequant_out(const at::Tensor& fp16_tensor, const at::Tensor& fp16_scale, int OC, int IC)
+{
+    TORCH_CHECK(fp16_tensor.scalar_type() == at::kHalf, "out must be FP16, got ", fp16_tensor.scalar_type());
+    TORCH_CHECK(fp16_tensor.dim() == 2 && fp16_tensor.size(0) == OC && fp16_tensor.size(1) == IC,
+                "out must have shape [", OC, ", ", IC, "], got ", fp16_tensor.sizes());
+    TORCH_CHECK(fp16_tensor.is_contiguous(), "out must be contiguous");
+    TORCH_CHECK(fp16_tensor.device() == fp16_scale.device(), "out must be on the same device as scale");
+}
+
 /*
  * Dequant a FP6 matrix to a equivalent FP16 matrix using CPUs.
  * A useful tool to construct input matrices for the FP16 GEMM baseline.
@@ -190,30 +364,82 @@ at::Tensor fp16_to_fp6_cpu(at::Tensor fp16_tensor)
  *  fp6_tensor:  int  tensor of shape [OC, IC // 16 * 3];   // 3 INT32 words contains 16 FP6  weights.
  *  fp16_scale:  half tensor of shape [OC];                 // for row-wise quantization.
  * [Output]
- *  fp16_tensor: half tensor of shape [OC, IC].     
+ *  fp16_tensor: half tensor of shape [OC, IC]. The result is written to it.
  */
-at::Tensor weight_matrix_dequant_cpu(at::Tensor fp6_tensor, at::Tensor fp16_scale) 
+void weight_matrix_dequant_cpu_out(at::Tensor fp6_tensor, at::Tensor fp16_scale, at::Tensor& fp16_tensor)
 {
     int OC = fp6_tensor.size(0);
     TORCH_CHECK(fp6_tensor.size(1) % 3 == 0);
     int IC = fp6_tensor.size(1) / 3 * 16;
     TORCH_CHECK(fp16_scale.size(0) == OC);
+    check_weight_matrix_dequant_out(fp16_tensor, fp16_scale, OC, IC);
     //
     auto fp6_tensor_ptr = reinterpret_cast<unsigned char*>(fp6_tensor.data_ptr<int>());
     auto fp16_scale_ptr = reinterpret_cast<half*>(fp16_scale.data_ptr<at::Half>());
-    //
-    auto options = at::TensorOptions().dtype(at::kHalf).device(fp16_scale.device());
-    at::Tensor fp16_tensor = at::empty({OC, IC}, options);
     auto fp16_tensor_ptr = reinterpret_cast<half*>(fp16_tensor.data_ptr<at::Half>());
     //
     DeQuantMatrix_FP6_To_FP16(fp16_tensor_ptr, fp6_tensor_ptr, OC, IC, fp16_scale_ptr);
+}
+
+at::Tensor weight_matrix_dequant_cpu(at::Tensor fp6_tensor, at::Tensor fp16_scale) 
+{
+    auto options = at::TensorOptions().dtype(at::kHalf).device(fp16_scale.device());
+    at::Tensor fp16_tensor = at::empty({fp6_tensor.size(0), fp6_tensor.size(1) / 3 * 16}, options);
+    weight_matrix_dequant_cpu_out(fp6_tensor, fp16_scale, fp16_tensor);
+    return fp16_tensor;
+}
+
+/*
+ * Dequant a FP6 matrix to a equivalent FP16 matrix using GPUs.
+ * Same inputs and outputs as weight_matrix_dequant_cpu_out().
+ */
+void weight_matrix_dequant_cuda_out(at::Tensor fp6_tensor, at::Tensor fp16_scale, at::Tensor& fp16_tensor)
+{
+    TORCH_CHECK(fp6_tensor.is_cuda(), "weight must be on CUDA");
+    TORCH_CHECK(fp16_scale.device() == fp6_tensor.device(), "scale must be on the same device as weight");
+    const c10::cuda::CUDAGuard device_guard(fp6_tensor.device());
+    TORCH_CHECK(fp6_tensor.is_contiguous(), "weight must be contiguous");
+    TORCH_CHECK(fp16_scale.is_contiguous(), "scale must be contiguous");
+    int OC = fp6_tensor.size(0);
+    TORCH_CHECK(fp6_tensor.size(1) % 3 == 0);
+    int IC = fp6_tensor.size(1) / 3 * 16;
+    TORCH_CHECK(fp16_scale.size(0) == OC);
+    check_weight_matrix_dequant_out(fp16_tensor, fp16_scale, OC, IC);
+    //
+    auto fp6_tensor_ptr = reinterpret_cast<const uint32_t*>(fp6_tensor.data_ptr<int>());
+    auto fp16_scale_ptr = reinterpret_cast<const half*>(fp16_scale.data_ptr<at::Half>());
+    TORCH_CHECK(reinterpret_cast<uintptr_t>(fp6_tensor_ptr) % 16 == 0, "weight must be 16 Bytes aligned");
+    auto fp16_tensor_ptr = reinterpret_cast<half*>(fp16_tensor.data_ptr<at::Half>());
+    TORCH_CHECK(reinterpret_cast<uintptr_t>(fp16_tensor_ptr) % 4 == 0, "out must be 4 Bytes aligned");
     //
+    size_t NumFP6Blocks = (size_t)OC * IC / 16;
+    if (NumFP6Blocks == 0) return;
+    size_t NumWarps = (NumFP6Blocks - 1) / DEQUANT_FP6_BLOCKS_PER_WARP + 1;
+    dim3 GridDim((NumWarps - 1) / DEQUANT_WARPS_PER_BLOCK + 1, 1, 1);
+    dim3 BlockDim(WARP_SIZE * DEQUANT_WARPS_PER_BLOCK, 1, 1);
+    DeQuantMatrix_FP6_To_FP16_Kernel<<<GridDim, BlockDim, 0, at::cuda::getCurrentCUDAStream()>>>
+                    (fp16_tensor_ptr, fp6_tensor_ptr, OC, IC, fp16_scale_ptr);
+    C10_CUDA_KERNEL_LAUNCH_CHECK();
+}
+
+at::Tensor weight_matrix_dequant_cuda(at::Tensor fp6_tensor, at::Tensor fp16_scale)
+{
+    auto options = at::TensorOptions().dtype(at::kHalf).device(fp6_tensor.device());
+    at::Tensor fp16_tensor = at::empty({fp6_tensor.size(0), fp6_tensor.size(1) / 3 * 16}, options);
+    weight_matrix_dequant_cuda_out(fp6_tensor, fp16_scale, fp16_tensor);
     return fp16_tensor;
 }
 
 TORCH_LIBRARY_IMPL(torchao, CPU, m) {
   m.impl("torchao::fp16_to_fp6", &fp16_to_fp6_cpu);
   m.impl("torchao::fp6_weight_dequant", &weight_matrix_dequant_cpu);
+  m.impl("torchao::fp6_weight_dequant_out", &weight_matrix_dequant_cpu_out);
+}
+
+TORCH_LIBRARY_IMPL(torchao, CUDA, m) {
+  m.impl("torchao::fp16_to_fp6", &fp16_to_fp6_cuda);
+  m.impl("torchao::fp6_weight_dequant", &weight_matrix_dequant_cuda);
+  m.impl("torchao::fp6_weight_dequant_out", &weight_matrix_dequant_cuda_out);
 }
 
 }
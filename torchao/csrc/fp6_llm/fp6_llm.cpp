@@ -1,3 +1,4 @@
+#include <ATen/ATen.h>
 #include <ATen/core/dispatch/Dispatcher.h>
 #include <torch/library.h>
 #include <torch/types.h>
@@ -8,4 +9,38 @@ TORCH_LIBRARY_FRAGMENT(torchao, m) {
   m.def("prepack_fp6_weight(Tensor fp6_tensor) -> Tensor");
   m.def("fp16_to_fp6(Tensor fp16_tensor) -> Tensor");
   m.def("fp6_weight_dequant(Tensor fp6_tensor, Tensor fp16_scale) -> Tensor");
+  m.def("fp6_weight_dequant_out(Tensor fp6_tensor, Tensor fp16_scale, Tensor(a!) out) -> ()");
+}
+
+namespace torchao {
+
+// Shape inference for fp16act_fp6weight_linear, used by FakeTensor / torch.compile.
+at::Tensor fp16act_fp6weight_linear_meta(const at::Tensor& _in_feats,
+                                         const at::Tensor& _weights,
+                                         const at::Tensor& _scales,
+                                         int64_t splitK)
+{
+  TORCH_CHECK(_in_feats.dim() == 2, "input should be a 2d tensor, got ", _in_feats.dim(), "D");
+  TORCH_CHECK(_in_feats.scalar_type() == at::kHalf, "input must be FP16, got ", _in_feats.scalar_type());
+  TORCH_CHECK(_weights.dim() == 2, "weight should be a 2d tensor, got ", _weights.dim(), "D");
+  TORCH_CHECK(_weights.scalar_type() == at::kInt, "weight must be INT32, got ", _weights.scalar_type());
+  TORCH_CHECK(_scales.dim() == 1, "scale should be a 1d tensor, got ", _scales.dim(), "D");
+  TORCH_CHECK(_scales.scalar_type() == at::kHalf, "scale must be FP16, got ", _scales.scalar_type());
+
+  auto BS = _in_feats.sym_size(0);
+  auto IC = _in_feats.sym_size(1);
+  auto OC = _weights.sym_size(0);
+  // Same layout constraints as the CUDA kernel, so that unsupported shapes fail at trace time.
+  TORCH_SYM_CHECK((IC % 64).sym_eq(0), "Expect input dim % 64 == 0");
+  TORCH_SYM_CHECK((OC % 256).sym_eq(0), "Expect output dim % 256 == 0");
+  TORCH_SYM_CHECK((IC * 3).sym_eq(_weights.sym_size(1) * 16), "Dimensions mismatched");
+  TORCH_SYM_CHECK(OC.sym_eq(_scales.sym_size(0)), "Dimensions mismatched");
+
+  return at::empty_symint({BS, OC}, _in_feats.options());
+}
+
+TORCH_LIBRARY_IMPL(torchao, Meta, m) {
+  m.impl("torchao::fp16act_fp6weight_linear", &fp16act_fp6weight_linear_meta);
+}
+
 }
@@ -1,14 +1,13 @@
 import torch
 from torch import Tensor
+from typing import Optional
 from torchao.quantization.utils import TORCH_VERSION_AFTER_2_4
 
+_register_fake = torch.library.register_fake if TORCH_VERSION_AFTER_2_4 else torch.library.impl_abstract
+
+
 def register_custom_op(name):
-    def decorator(func):
-        if TORCH_VERSION_AFTER_2_4:
-            return torch.library.register_fake(f"{name}")(func)
-        else:
-            return torch.library.impl_abstract(f"{name}")(func)
-    return decorator
+    return _register_fake(name)
 
 
 
@@ -35,6 +34,9 @@ def _(fp6_weight):
 def fp16_to_fp6(fp16_tensor: Tensor) -> Tensor:
     """
     Pack FP16 tensor (containing only FP6 values) into FP6 tensor.
+
+    On CPU, values out of the FP6 range raise an error. On CUDA, they are saturated to the FP6 absmax
+    or flushed to zero instead.
     """
     return torch.ops.torchao.fp16_to_fp6.default(fp16_tensor)
 
@@ -52,11 +54,16 @@ def fp16act_fp6weight_linear(_in_feats: Tensor, _weights: Tensor, _scales: Tenso
     """
     FP6-LLM linear layer A @ W.T. See https://arxiv.org/abs/2401.14112 for more details.
 
+    This is a single fused kernel: FP6 weights are dequantized to FP16 in registers and fed
+    directly to Tensor Cores, so the FP16 weight is never materialized in global memory.
+    Products are accumulated in FP32, and so are the partial results of split-K, which are
+    only rounded to FP16 when writing the output.
+
     Arguments
         _in_feats: input activations in FP16
         _weights: packed FP6 weights. See :func:prepack_fp6_weight and :func:fp16_to_fp6
         _scales: scale
-        splitK: split K
+        splitK: split K. Pass 0 to pick it automatically based on the problem size and the number of SMs
 
     Returns
         output of linear layer
@@ -64,35 +71,47 @@ def fp16act_fp6weight_linear(_in_feats: Tensor, _weights: Tensor, _scales: Tenso
     return torch.ops.torchao.fp16act_fp6weight_linear.default(_in_feats, _weights, _scales, splitK)
 
 
-@register_custom_op("torchao::fp16act_fp6weight_linear")
-def _(_in_feats, _weights, _scales, splitK = 1):
-    torch._check(_in_feats.dim() == 2, lambda: f"input should be a 2d tensor, got {_in_feats.dim()}D")
-    torch._check(_in_feats.dtype is torch.float16, lambda: f"weight must be FP16, got {_in_feats.dtype}")
-    torch._check(_weights.dim() == 2, lambda: f"weight should be a 2d tensor, got {_weights.dim()}D")
-    torch._check(_weights.dtype is torch.int32, lambda: f"weight must be INT32, got {_weights.dtype}")
-    torch._check(_scales.dim() == 1, lambda: f"scale should be a 2d tensor, got {_scales.dim()}D")
-    torch._check(_scales.dtype is torch.float16, lambda: f"scale must be FP16, got {_scales.dtype}")
+# The meta kernel of fp16act_fp6weight_linear is registered in C++, see torchao/csrc/fp6_llm/fp6_llm.cpp
 
-    BS, IC = _in_feats.shape
-    OC, _ = _weights.shape
-    torch._check(IC / 16 * 3 == _weights.shape[1], lambda: "Dimensions mismatched")
-    torch._check(OC == _scales.shape[0], lambda: "Dimensions mismatched")
 
-    return _in_feats.new_empty((BS, OC))
+def fp6_weight_dequant(fp6_tensor: Tensor, fp16_scale: Tensor, out: Optional[Tensor] = None) -> Tensor:
+    """
+    Dequantize a tightly-packed FP6 tensor to FP16. This is meant for debugging and for building
+    reference results; :func:`fp16act_fp6weight_linear` does not use it.
 
+    Arguments
+        fp6_tensor: tightly-packed FP6 weight, inside a `torch.int32` container
+        fp16_scale: row-wise scale in FP16
+        out: optional pre-allocated FP16 tensor of shape (OC, IC) to write the result to
 
-def fp6_weight_dequant(fp6_tensor: Tensor, fp16_scale: Tensor) -> Tensor:
-    return torch.ops.torchao.fp6_weight_dequant.default(fp6_tensor, fp16_scale)
+    Returns
+        dequantized weight in FP16
+    """
+    if out is None:
+        return torch.ops.torchao.fp6_weight_dequant.default(fp6_tensor, fp16_scale)
+    torch.ops.torchao.fp6_weight_dequant_out.default(fp6_tensor, fp16_scale, out)
+    return out
 
 
-@register_custom_op("torchao::fp6_weight_dequant")
-def _(fp6_tensor, fp16_scale):
+def _check_fp6_weight_dequant_args(fp6_tensor, fp16_scale):
     torch._check(fp6_tensor.dim() == 2, lambda: f"weight should be a 2d tensor, got {fp6_tensor.dim()}D")
     torch._check(fp6_tensor.dtype is torch.int32, lambda: f"weight must be INT32, got {fp6_tensor.dtype}")
-    torch._check(fp16_scale.dim() == 1, lambda: f"scale should be a 2d tensor, got {fp16_scale.dim()}D")
+    torch._check(fp16_scale.dim() == 1, lambda: f"scale should be a 1d tensor, got {fp16_scale.dim()}D")
     torch._check(fp16_scale.dtype is torch.float16, lambda: f"scale must be FP16, got {fp16_scale.dtype}")
 
     OC, _IC = fp6_tensor.shape
     torch._check(OC == fp16_scale.shape[0], lambda: "Dimensions mismatched")
+    return OC, _IC * 16 // 3
+
+
+@register_custom_op("torchao::fp6_weight_dequant")
+def _(fp6_tensor, fp16_scale):
+    OC, IC = _check_fp6_weight_dequant_args(fp6_tensor, fp16_scale)
+    return fp16_scale.new_empty((OC, IC), dtype=torch.float16)
+
 
-    return fp16_scale.new_empty((OC, _IC * 16 // 3))
+@register_custom_op("torchao::fp6_weight_dequant_out")
+def _(fp6_tensor, fp16_scale, out):
+    OC, IC = _check_fp6_weight_dequant_args(fp6_tensor, fp16_scale)
+    torch._check(out.shape == (OC, IC), lambda: f"out must have shape {(OC, IC)}, got {tuple(out.shape)}")
+    torch._check(out.dtype is torch.float16, lambda: f"out must be FP16, got {out.dtype}")